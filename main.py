@@ -13,6 +13,7 @@ from discord.ext import commands
 
 from play import Wave, morse_msg
 from room import Room
+from schedule import JoinScheduler, retryable
 from view import RoomView
 
 SRCDIR = Path(__file__).resolve().parent
@@ -125,6 +126,20 @@ client = SFBM()
 
 rooms: dict[str, Room] = {}
 
+scheduler = JoinScheduler(
+    concurrency=CONFIG.get('join_concurrency', 4),
+    retries=CONFIG.get('join_retries', 3),
+    aging=CONFIG.get('join_aging', 10.0),
+)
+# discord.py retries a failed voice handshake by itself (up to 5 tries, each
+# bounded by JOIN_HANDSHAKE_TIMEOUT, with a 1s, 3s, ... pause between) when
+# reconnect=True, which we keep so that established connections survive
+# drops. JOIN_TIMEOUT caps a whole connect() call, internal retries included,
+# so a scheduler slot is held for at most this long per scheduler attempt;
+# with the defaults that leaves room for two handshake tries per attempt.
+JOIN_TIMEOUT: float = CONFIG.get('join_timeout', 30)
+JOIN_HANDSHAKE_TIMEOUT: float = CONFIG.get('join_handshake_timeout', 10)
+
 async def _join(ctx: discord.Interaction, name: str, net: bool) -> tuple[Room, RoomView]:
     assert isinstance(ctx.channel, discord.TextChannel)
     assert isinstance(ctx.user, discord.Member)
@@ -138,16 +153,62 @@ async def _join(ctx: discord.Interaction, name: str, net: bool) -> tuple[Room, R
         raise app_commands.CheckFailure("You're not in a voice channel!")
     if ctx.guild.voice_client is not None:
         raise app_commands.CheckFailure('Already in a voice channel!')
+    guild = ctx.guild
+    user = ctx.user
+
+    async def connect() -> tuple[discord.VoiceClient, Wave]:
+        # the user may have moved or left while we were queued
+        if user.voice is None or user.voice.channel is None:
+            raise app_commands.CheckFailure("You're not in a voice channel!")
+        channel = user.voice.channel
+        # another join in this guild may have finished while we were queued;
+        # the scheduler runs one job per guild at a time, so any client
+        # registered past this point is the one we're creating
+        if guild.voice_client is not None:
+            raise app_commands.CheckFailure('Already in a voice channel!')
+        try:
+            vc = await asyncio.wait_for(
+                channel.connect(timeout=JOIN_HANDSHAKE_TIMEOUT), JOIN_TIMEOUT)
+        except BaseException as exc:
+            # discord.py only unregisters the client itself on timeout
+            if guild.voice_client is not None:
+                await guild.voice_client.disconnect(force=True)
+            if isinstance(exc, discord.Forbidden):
+                raise app_commands.BotMissingPermissions(['connect'])
+            raise
+        wave = Wave()
+        try:
+            vc.play(wave, application='audio', signal_type='music')
+        except discord.Forbidden:
+            await vc.disconnect()
+            raise app_commands.BotMissingPermissions(['speak'])
+        return (vc, wave)
+
+    async def abandon(result: tuple[discord.VoiceClient, Wave]) -> None:
+        # the interaction went away after we connected; nothing will use this
+        vc, _ = result
+        if guild.voice_client is vc:
+            await vc.disconnect(force=True)
+
+    async def progress(position: int, attempt: int) -> None:
+        if position:
+            content = f'Waiting to join voice channel (#{position} in queue)...'
+        elif attempt:
+            content = f'Voice connection failed, retrying (attempt {attempt + 1})...'
+        else:
+            content = 'Joining voice channel...'
+        await ctx.edit_original_response(content=content)
+
+    # people already in the room are waiting to hear from this server
+    priority = 0 if name in rooms and rooms[name].views else 1
     try:
-        vc = await ctx.user.voice.channel.connect()
-    except discord.Forbidden:
-        raise app_commands.BotMissingPermissions(['connect'])
-    wave = Wave()
-    try:
-        vc.play(wave, application='audio', signal_type='music')
-    except discord.Forbidden:
-        await vc.disconnect()
-        raise app_commands.BotMissingPermissions(['speak'])
+        _, wave = await scheduler.schedule(connect, key=guild.id,
+                                           priority=priority,
+                                           progress=progress, cleanup=abandon)
+    except Exception as exc:
+        if retryable(exc):
+            raise app_commands.CheckFailure("Couldn't connect to your voice channel, try again later.") from exc
+        raise
     # get or create room
     if name not in rooms:
         room = Room(name, net=net)
@@ -160,7 +221,7 @@ async def _join(ctx: discord.Interaction, name: str, net: bool) -> tuple[Room, R
     view = RoomView(msg=msg, room=room, audio=wave, user=(ctx.guild, ctx.user))
     room.views.add(view)
     # display view
-    await ctx.edit_original_response(embed=view.make_embed(), view=view)
+    await ctx.edit_original_response(content=None, embed=view.make_embed(), view=view)
     return (room, view)
 
 class AccessKeyModal(discord.ui.Modal):
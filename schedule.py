@@ -0,0 +1,168 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import logging
+import random
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+import discord
+
+logger = logging.getLogger('sfbm.schedule')
+
+T = TypeVar('T')
+# called with (position in queue or 0 if not queued, retry attempt number)
+Progress = Callable[[int, int], Awaitable[None]]
+# called with the result of a job whose waiter went away mid-run
+Cleanup = Callable[[T], Awaitable[None]]
+
+def retryable(exc: BaseException) -> bool:
+    """Whether a failed voice connection is worth trying again."""
+    if isinstance(exc, discord.HTTPException):
+        # 429s and server errors are transient; anything else is our fault
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (
+        asyncio.TimeoutError,
+        discord.ConnectionClosed,
+        discord.GatewayNotFound,
+        OSError,
+    ))
+
+@dataclass(order=True)
+class Job(Generic[T]):
+
+    rank: float
+    seq: int
+    factory: Callable[[], Awaitable[T]] = field(compare=False)
+    future: asyncio.Future[T] = field(compare=False)
+    cleanup: Cleanup[T] | None = field(default=None, compare=False)
+    key: Hashable | None = field(default=None, compare=False)
+    attempt: int = field(default=0, compare=False)
+    abandoned: bool = field(default=False, compare=False)
+
+class JoinScheduler:
+    """Run voice connections with bounded concurrency.
+
+    Jobs with a lower priority number run first, but every ``aging``
+    seconds spent waiting counts as one priority level, so low priority
+    jobs can't be starved; ties run in submission order. Jobs that fail
+    transiently are retried with jittered exponential backoff, during which
+    they don't hold a connection slot. At most one job per ``key`` runs at a
+    time; the rest wait their turn without blocking other keys.
+    """
+
+    def __init__(self, concurrency: int = 4, retries: int = 3,
+                 base_delay: float = 1.0, max_delay: float = 30.0,
+                 interval: float = 2.0, aging: float = 10.0) -> None:
+        self.concurrency = concurrency
+        self.retries = retries
+        self.aging = aging
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.interval = interval
+        self.queue: list[Job[Any]] = []
+        self.running = 0
+        self.active: set[Hashable] = set()
+        self.tasks: set[asyncio.Task[None]] = set()
+        self.counter = itertools.count()
+
+    def position(self, job: Job[Any]) -> int:
+        if job not in self.queue:
+            return 0
+        return 1 + sum(other < job for other in self.queue)
+
+    async def schedule(self, factory: Callable[[], Awaitable[T]], *,
+                       key: Hashable | None = None,
+                       priority: int = 0,
+                       progress: Progress | None = None,
+                       cleanup: Cleanup[T] | None = None) -> T:
+        loop = asyncio.get_running_loop()
+        # priority - waited / aging orders jobs the same way at any instant,
+        # and unlike it this doesn't change while the job sits in the heap
+        rank = priority + loop.time() / self.aging
+        job = Job(rank, next(self.counter), factory, loop.create_future(),
+                  cleanup, key)
+        self.push(job)
+        state = (0, 0)
+        try:
+            while True:
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.shield(job.future), self.interval)
+                except asyncio.TimeoutError:
+                    if job.future.done():
+                        return job.future.result()
+                new_state = (self.position(job), job.attempt)
+                if progress is None or new_state == state:
+                    continue
+                state = new_state
+                try:
+                    await progress(*state)
+                except Exception as exc:
+                    logger.warning('Failed to report join progress - %s: %s',
+                                   type(exc).__name__, exc)
+        finally:
+            if not job.future.done():
+                # the waiter went away; if the job hasn't started, don't
+                # start it, otherwise run() hands its result to cleanup
+                job.abandoned = True
+                if job in self.queue:
+                    self.queue.remove(job)
+                    heapq.heapify(self.queue)
+
+    def push(self, job: Job[Any]) -> None:
+        if job.abandoned:
+            return
+        heapq.heappush(self.queue, job)
+        self.dispatch()
+
+    def dispatch(self) -> None:
+        blocked: list[Job[Any]] = []
+        while self.queue and self.running < self.concurrency:
+            job = heapq.heappop(self.queue)
+            if job.key is not None and job.key in self.active:
+                blocked.append(job)
+                continue
+            if job.key is not None:
+                self.active.add(job.key)
+            self.running += 1
+            task = asyncio.create_task(self.run(job))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        for job in blocked:
+            heapq.heappush(self.queue, job)
+
+    async def run(self, job: Job[Any]) -> None:
+        try:
+            result = await job.factory()
+        except Exception as exc:
+            if job.abandoned:
+                return
+            if job.attempt < self.retries and retryable(exc):
+                job.attempt += 1
+                delay = random.uniform(0, min(
+                    self.max_delay, self.base_delay * 2 ** job.attempt))
+                logger.warning('Join attempt %d failed - %s: %s; '
+                               'retrying in %.1fs', job.attempt,
+                               type(exc).__name__, exc, delay)
+                # keep the original rank and sequence so it doesn't lose its place
+                asyncio.get_running_loop().call_later(delay, self.push, job)
+            else:
+                if retryable(exc):
+                    logger.error('Join failed after %d attempts - %s: %s',
+                                 job.attempt + 1, type(exc).__name__, exc)
+                job.future.set_exception(exc)
+        else:
+            if not job.abandoned:
+                job.future.set_result(result)
+            elif job.cleanup is not None:
+                try:
+                    await job.cleanup(result)
+                except Exception as exc:
+                    logger.warning('Failed to clean up abandoned join - %s: %s',
+                                   type(exc).__name__, exc)
+        finally:
+            self.running -= 1
+            self.active.discard(job.key)
+            self.dispatch()